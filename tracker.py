@@ -1,19 +1,148 @@
+import argparse
+import os
+import re
 import sqlite3
-from collections import defaultdict
+from contextlib import contextmanager
 from datetime import datetime
+from itertools import chain, groupby
+from operator import itemgetter
+# csv and mmap are only needed for CSV import, so they are imported there instead
 
 # --- Configuration ---
 DB_FILE = 'dominion_stats.db'
+# Columns a CSV game export must have; 'Expansions Used' and 'Notes' are optional
+# and any 'Game ID' column is ignored, since imported games get new ids
+CSV_REQUIRED_COLUMNS = ['Date', 'Players', 'Winner(s)', 'Scores', 'Kingdom Cards']
+CSV_OPTIONAL_COLUMNS = ['Expansions Used', 'Notes']
 
 # --- Database Functions ---
 
+# Per-connection settings; journal_mode=WAL is persisted in the file and set separately
+CONNECTION_PRAGMAS = '''
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA mmap_size=268435456;
+    PRAGMA foreign_keys=ON;
+'''
+
+# SQL used on every game/card read and write; sqlite3 caches the compiled statements
+INSERT_GAME_SQL = '''
+    INSERT INTO games (game_date, players, winners, scores, kingdom_cards, expansions_used, notes)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+INSERT_PLAYER_SQL = "INSERT INTO game_players (game_id, player, score, is_winner) VALUES (?, ?, ?, ?)"
+INSERT_GAME_CARD_SQL = "INSERT INTO game_cards (game_id, card) VALUES (?, ?)"
+BACKFILL_PLAYER_SQL = "INSERT OR IGNORE INTO game_players (game_id, player, score, is_winner) VALUES (?, ?, ?, ?)"
+BACKFILL_GAME_CARD_SQL = "INSERT OR IGNORE INTO game_cards (game_id, card) VALUES (?, ?)"
+# Every game joined with its players (one row each) and its comma-joined Kingdom Cards;
+# the correlated subquery is a PK index lookup per row, in insertion order
+SELECT_GAMES_WITH_PLAYERS_SQL = '''
+    SELECT g.id, g.game_date, g.expansions_used, g.notes,
+        (SELECT group_concat(card, ', ')
+         FROM (SELECT card FROM game_cards WHERE game_id = g.id ORDER BY rowid)) AS cards,
+        gp.player, gp.score, gp.is_winner
+    FROM games g
+    LEFT JOIN game_players gp ON gp.game_id = g.id
+    ORDER BY g.id, gp.rowid
+'''
+# Adds one game's (or a batch's) totals for a player to their running stats
+UPSERT_PLAYER_STATS_SQL = '''
+    INSERT INTO player_stats (player, games, wins, total_score, scored_games, max_score)
+    VALUES (?, ?, ?, ?, ?, ?)
+    ON CONFLICT(player) DO UPDATE SET
+        games = games + excluded.games,
+        wins = wins + excluded.wins,
+        total_score = total_score + excluded.total_score,
+        scored_games = scored_games + excluded.scored_games,
+        max_score = COALESCE(MAX(max_score, excluded.max_score), max_score, excluded.max_score)
+'''
+INSERT_CARD_SQL = "INSERT INTO all_kingdom_cards (card_name) VALUES (?)"
+SELECT_CARDS_SQL = "SELECT card_name FROM all_kingdom_cards ORDER BY card_name"
+
+_conn = None
+# When set (--in-memory), the database is copied into RAM at startup and only written back by save_db()
+_in_memory = False
+# Known Kingdom Cards change rarely, so they are cached until a card is added
+_cards_cache = None
+_card_set_cache = None
+# Bloom filter over known card names (see card_may_be_known); cards are never
+# removed, so it only ever needs bits added and survives invalidate_card_cache()
+CARD_BLOOM_BITS = 2 ** 14
+CARD_BLOOM_HASHES = 3
+_card_bloom = None
+
 def connect_db():
-    """Establishes a connection to the SQLite database."""
-    return sqlite3.connect(DB_FILE)
+    """Establishes a connection to the SQLite database (or an in-memory copy of it)."""
+    # isolation_level=None leaves transactions to us (see transaction())
+    if _in_memory:
+        conn = sqlite3.connect(':memory:', isolation_level=None, cached_statements=256)
+        disk = sqlite3.connect(DB_FILE)
+        disk.backup(conn)
+        disk.close()
+    else:
+        conn = sqlite3.connect(DB_FILE, isolation_level=None, cached_statements=256)
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] != 'wal':
+            conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(CONNECTION_PRAGMAS)
+    # Rows can be read by column name as well as unpacked like tuples
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def use_in_memory_db():
+    """Makes the next connection work on an in-memory copy of DB_FILE."""
+    global _in_memory
+    close_db()
+    _in_memory = True
+
+def save_db():
+    """Writes the in-memory database back to DB_FILE; file-backed sessions save as they go."""
+    if not _in_memory:
+        print("Changes are saved automatically. ℹ️")
+        return
+    if _conn is None:
+        return
+    try:
+        disk = sqlite3.connect(DB_FILE)
+        try:
+            _conn.backup(disk)
+        finally:
+            disk.close()
+        print(f"Database saved to {DB_FILE}. ✅")
+    except sqlite3.Error as e:
+        print(f"Error saving database: {e}")
+
+def get_conn():
+    """Returns the shared database connection, opening it on first use."""
+    global _conn
+    if _conn is None:
+        _conn = connect_db()
+    return _conn
+
+def close_db():
+    """Closes the shared database connection if it is open."""
+    global _conn
+    if _conn is not None:
+        # Refresh any planner statistics this session's queries found stale
+        _conn.execute("PRAGMA optimize")
+        _conn.close()
+        _conn = None
+
+@contextmanager
+def transaction(conn):
+    """Runs the enclosed statements in a single transaction, rolling back on error."""
+    conn.execute("BEGIN")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    else:
+        conn.execute("COMMIT")
 
 def create_tables():
-    """Creates the games and kingdom_cards tables if they don't already exist."""
-    conn = connect_db()
+    """Creates the game and kingdom card tables if they don't already exist."""
+    conn = get_conn()
     cursor = conn.cursor()
 
     # Table for game records
@@ -29,6 +158,48 @@ def create_tables():
             notes TEXT
         )
     ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_games_date ON games(game_date)")
+
+    # One row per player per game; score is NULL if none was entered for that player
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS game_players (
+            game_id INTEGER NOT NULL REFERENCES games(id),
+            player TEXT NOT NULL,
+            score INTEGER,
+            is_winner INTEGER NOT NULL,
+            PRIMARY KEY (game_id, player)
+        )
+    ''')
+    # Covers per-player lookups, best-score queries and the player_stats rebuild;
+    # replaces the older idx_gp_player and idx_gp_player_score
+    cursor.execute("DROP INDEX IF EXISTS idx_gp_player")
+    cursor.execute("DROP INDEX IF EXISTS idx_gp_player_score")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_gp_player_score_win ON game_players(player, score DESC, is_winner)")
+
+    # One row per Kingdom Card used in each game
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS game_cards (
+            game_id INTEGER NOT NULL REFERENCES games(id),
+            card TEXT NOT NULL,
+            PRIMARY KEY (game_id, card)
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_gc_card ON game_cards(card)")
+
+    # Running per-player totals, kept in step with game_players by every write
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS player_stats (
+            player TEXT PRIMARY KEY,
+            games INTEGER NOT NULL,
+            wins INTEGER NOT NULL,
+            total_score INTEGER NOT NULL,
+            scored_games INTEGER NOT NULL,
+            max_score INTEGER
+        )
+    ''')
+
+    # Superseded by game_players, which the backfill below rebuilds from games
+    cursor.execute("DROP TABLE IF EXISTS game_scores")
 
     # Table for all known Kingdom Cards
     cursor.execute('''
@@ -41,8 +212,40 @@ def create_tables():
             -- expansion TEXT
         )
     ''')
-    conn.commit()
-    conn.close()
+
+    # Backfill the per-game tables for games recorded before they existed; a game
+    # already present in either table has been migrated, so OR IGNORE is only a safety net
+    cursor.execute('''
+        SELECT id, players, winners, scores, kingdom_cards FROM games
+        WHERE id NOT IN (SELECT game_id FROM game_players)
+          AND id NOT IN (SELECT game_id FROM game_cards)
+    ''')
+    legacy_games = cursor.fetchall()
+    if legacy_games:
+        with transaction(conn):
+            for game_id, *fields in legacy_games:
+                players, cards = normalize_game(game_id, *fields)
+                cursor.executemany(BACKFILL_PLAYER_SQL, players)
+                cursor.executemany(BACKFILL_GAME_CARD_SQL, cards)
+
+    # Rebuild player_stats if games were backfilled or the table is new
+    cursor.execute("SELECT EXISTS (SELECT 1 FROM player_stats)")
+    rebuild_stats = bool(legacy_games) or not cursor.fetchone()[0]
+    if rebuild_stats:
+        with transaction(conn):
+            cursor.execute("DELETE FROM player_stats")
+            cursor.execute('''
+                INSERT INTO player_stats (player, games, wins, total_score, scored_games, max_score)
+                SELECT player, COUNT(*), SUM(is_winner), COALESCE(SUM(score), 0), COUNT(score), MAX(score)
+                FROM game_players
+                GROUP BY player
+            ''')
+
+    # Gather planner statistics on first run and after a backfill or rebuild;
+    # older SQLite versions never create sqlite_stat1 from PRAGMA optimize alone
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+    if rebuild_stats or cursor.fetchone() is None:
+        cursor.execute("ANALYZE")
 
 def seed_kingdom_cards():
     """Populates the all_kingdom_cards table with initial card names if it's empty."""
@@ -65,32 +268,33 @@ def seed_kingdom_cards():
         "Grand Market", "Count", "Dame Anna", "Sir Martin" # More diverse
     ]
 
-    conn = connect_db()
+    conn = get_conn()
     cursor = conn.cursor()
 
     # Check if the table is empty
     cursor.execute("SELECT COUNT(*) FROM all_kingdom_cards")
     if cursor.fetchone()[0] == 0:
         print("Seeding initial Kingdom Cards...")
-        for card_name in sorted(initial_cards): # Sort for consistent insertion order
-            try:
-                cursor.execute("INSERT INTO all_kingdom_cards (card_name) VALUES (?)", (card_name,))
-            except sqlite3.IntegrityError:
-                # This handles cases where a card might be duplicated in initial_cards list
-                pass
-        conn.commit()
-        print(f"Seeded {len(initial_cards)} cards.")
+        with transaction(conn):
+            # OR IGNORE skips any card duplicated in initial_cards; sorted for consistent insertion order
+            cursor.executemany(
+                "INSERT OR IGNORE INTO all_kingdom_cards (card_name) VALUES (?)",
+                [(card_name,) for card_name in sorted(set(initial_cards))]
+            )
+        invalidate_card_cache()
+        for card_name in initial_cards:
+            add_to_card_bloom(card_name)
+        print(f"Seeded {cursor.rowcount} cards.")
     else:
         print("Kingdom Cards table already populated.")
-    conn.close()
 
 def add_kingdom_card(card_name):
     """Adds a single kingdom card to the all_kingdom_cards table."""
-    conn = connect_db()
-    cursor = conn.cursor()
+    cursor = get_conn().cursor()
     try:
-        cursor.execute("INSERT INTO all_kingdom_cards (card_name) VALUES (?)", (card_name,))
-        conn.commit()
+        cursor.execute(INSERT_CARD_SQL, (card_name,))
+        invalidate_card_cache()
+        add_to_card_bloom(card_name)
         print(f"'{card_name}' added to known Kingdom Cards. ✅")
         return True
     except sqlite3.IntegrityError:
@@ -99,20 +303,107 @@ def add_kingdom_card(card_name):
     except sqlite3.Error as e:
         print(f"Error adding card: {e}")
         return False
-    finally:
-        conn.close()
 
 def get_all_known_kingdom_cards():
-    """Retrieves all card names from the all_kingdom_cards table."""
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT card_name FROM all_kingdom_cards ORDER BY card_name")
-    cards = [row[0] for row in cursor.fetchall()]
-    conn.close()
-    return cards
+    """Retrieves all card names from the all_kingdom_cards table, sorted by name."""
+    global _cards_cache
+    if _cards_cache is None:
+        cursor = get_conn().cursor()
+        cursor.execute(SELECT_CARDS_SQL)
+        _cards_cache = tuple(row[0] for row in cursor.fetchall())
+    return _cards_cache
+
+def get_known_kingdom_card_set():
+    """Returns the known card names as a frozenset for fast membership checks."""
+    global _card_set_cache
+    if _card_set_cache is None:
+        _card_set_cache = frozenset(get_all_known_kingdom_cards())
+    return _card_set_cache
+
+def invalidate_card_cache():
+    """Forgets the cached card list so the next lookup re-reads the database."""
+    global _cards_cache, _card_set_cache
+    _cards_cache = None
+    _card_set_cache = None
+
+def card_bloom_positions(card_name):
+    """Returns the bloom filter bit positions for a card name (double hashing of hash())."""
+    h = hash(card_name) & 0xFFFFFFFFFFFFFFFF
+    h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+    return [(h1 + i * h2) % CARD_BLOOM_BITS for i in range(CARD_BLOOM_HASHES)]
+
+def add_to_card_bloom(card_name):
+    """Sets a card's bits in the bloom filter, if it has been built yet."""
+    if _card_bloom is not None:
+        for bit in card_bloom_positions(card_name):
+            _card_bloom[bit >> 3] |= 1 << (bit & 7)
+
+def card_may_be_known(card_name):
+    """Bloom filter probe: False means the card is definitely unknown, True means check further."""
+    global _card_bloom
+    if _card_bloom is None:
+        _card_bloom = bytearray(CARD_BLOOM_BITS // 8)
+        for card in get_all_known_kingdom_cards():
+            add_to_card_bloom(card)
+    return all(_card_bloom[bit >> 3] & (1 << (bit & 7)) for bit in card_bloom_positions(card_name))
 
 # --- Helper Functions ---
 
+def split_field(value):
+    """Splits a stored semicolon-separated field into a list of names."""
+    return [v.strip() for v in value.split(';') if v.strip()] if value else []
+
+def player_rows(game_id, players, scores, winners):
+    """Builds game_players rows for everyone who played or scored in a game.
+
+    Winners who are neither are not added as players; see normalize_game.
+    """
+    names = dict.fromkeys([*players, *scores]) # Ordered, without duplicates
+    return [(game_id, player, scores.get(player), int(player in winners)) for player in names]
+
+def card_rows(game_id, cards):
+    """Builds game_cards rows for the Kingdom Cards used in a game."""
+    return [(game_id, card) for card in dict.fromkeys(cards)]
+
+def stats_rows(player_rows):
+    """Sums game_players rows into one player_stats delta per player (see UPSERT_PLAYER_STATS_SQL)."""
+    # player -> [games, wins, total_score, scored_games, max_score], one lookup per row
+    stats = {}
+    for _, player, score, is_winner in player_rows:
+        s = stats.get(player)
+        if s is None:
+            s = stats[player] = [0, 0, 0, 0, None]
+        s[0] += 1
+        s[1] += is_winner
+        if score is not None:
+            s[2] += score
+            s[3] += 1
+            if s[4] is None or score > s[4]:
+                s[4] = score
+    return [(player, *s) for player, s in stats.items()]
+
+def normalize_game(game_id, players_str, winners_str, scores_str, kingdom_cards_str):
+    """Builds game_players and game_cards rows from a game's stored semicolon-separated fields."""
+    players = player_rows(game_id, split_field(players_str), parse_scores(scores_str), split_field(winners_str))
+    names = {player for _, player, _, _ in players}
+    for winner in split_field(winners_str):
+        if winner not in names:
+            print(f"Warning: Winner '{winner}' for Game ID {game_id} not found in players list for that game.")
+    return players, card_rows(game_id, split_field(kingdom_cards_str))
+
+# A single 'Player:Score' pair, matched with fullmatch against one separated piece
+_SCORE_PAIR_RE = re.compile(r'\s*([^:\s][^:]*?)\s*:\s*([+-]?\d+)\s*')
+
+def parse_scores(scores_str):
+    """Parses a stored 'Player:Score;Player:Score' string into a dict, skipping malformed pairs."""
+    scores_dict = {}
+    if scores_str:
+        for pair in scores_str.split(';'):
+            m = _SCORE_PAIR_RE.fullmatch(pair)
+            if m:
+                scores_dict[m.group(1)] = int(m.group(2))
+    return scores_dict
+
 def record_game():
     """Prompts the user for game details and records them in the database."""
     print("\n--- Record New Dominion Game ---")
@@ -131,40 +422,42 @@ def record_game():
     if not winners:
         print("Error: At least one winner name is required.")
         return
+    for winner in winners:
+        if winner not in players:
+            print(f"Warning: Winner '{winner}' is not one of the players and will be ignored.")
+    winners = [w for w in winners if w in players]
+    if not winners:
+        print("Error: At least one winner must be one of the players.")
+        return
     
     scores_input = input("Enter scores for each player (e.g., 'Player1:30,Player2:25'): ")
     scores_dict = {}
-    try:
-        score_pairs = [s.strip() for s in scores_input.split(',') if s.strip()]
-        for sp in score_pairs:
-            parts = sp.split(':')
-            if len(parts) == 2:
-                player_name = parts[0].strip()
-                score_val = int(parts[1].strip())
-                scores_dict[player_name] = score_val
-            else:
-                print(f"Warning: Skipping malformed score entry '{sp}'. Please use 'Player:Score' format.")
-        if not scores_dict:
-            print("Error: No valid scores entered.")
-            return
-    except ValueError:
-        print("Error: Invalid score format. Please ensure scores are integers.")
+    score_pairs = [s.strip() for s in scores_input.split(',') if s.strip()]
+    for sp in score_pairs:
+        m = _SCORE_PAIR_RE.fullmatch(sp)
+        if m:
+            scores_dict[m.group(1)] = int(m.group(2))
+        else:
+            print(f"Warning: Skipping malformed score entry '{sp}'. Please use 'Player:Score' format with an integer score.")
+    if not scores_dict:
+        print("Error: No valid scores entered.")
         return
     
     # --- Kingdom Card Validation ---
     known_cards = get_all_known_kingdom_cards()
     print("\nAvailable Kingdom Cards:")
-    print(", ".join(known_cards) if known_cards else "No cards in database. Add them using option 5.")
+    print(", ".join(known_cards) if known_cards else "No cards in database. Add them using option 4.")
 
     kingdom_cards_input = input("Enter Kingdom Cards used (comma-separated): ")
     entered_kingdom_cards = [c.strip() for c in kingdom_cards_input.split(',') if c.strip()]
     
+    known_card_set = get_known_kingdom_card_set()
     validated_kingdom_cards = []
     for card in entered_kingdom_cards:
-        if card in known_cards:
+        if card_may_be_known(card) and card in known_card_set:
             validated_kingdom_cards.append(card)
         else:
-            print(f"Warning: '{card}' is not a recognized Kingdom Card. Please ensure correct spelling or add it to the database via option 5.")
+            print(f"Warning: '{card}' is not a recognized Kingdom Card. Please ensure correct spelling or add it to the database via option 4.")
     
     if not validated_kingdom_cards:
         print("Error: No valid Kingdom Cards entered. Game not recorded.")
@@ -175,137 +468,279 @@ def record_game():
     
     notes = input("Any additional notes? ")
 
-    conn = connect_db()
+    conn = get_conn()
     cursor = conn.cursor()
     
     try:
-        cursor.execute('''
-            INSERT INTO games (game_date, players, winners, scores, kingdom_cards, expansions_used, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        with transaction(conn):
+            cursor.execute(INSERT_GAME_SQL, (
+                game_date,
+                ';'.join(players),
+                ';'.join(winners),
+                ';'.join([f"{k}:{v}" for k, v in scores_dict.items()]),
+                ';'.join(validated_kingdom_cards), # Use validated cards
+                ';'.join(expansions),
+                notes
+            ))
+            game_id = cursor.lastrowid
+            game_players = player_rows(game_id, players, scores_dict, winners)
+            cursor.executemany(INSERT_PLAYER_SQL, game_players)
+            cursor.executemany(UPSERT_PLAYER_STATS_SQL, stats_rows(game_players))
+            cursor.executemany(INSERT_GAME_CARD_SQL, card_rows(game_id, validated_kingdom_cards))
+        print(f"Game {game_id} recorded successfully! ✅")
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+
+def record_games_bulk(rows):
+    """Inserts many games in a single transaction and returns how many were added.
+
+    Each row holds the games columns in INSERT_GAME_SQL order, with lists stored
+    as semicolon-separated strings just like record_game writes them.
+    """
+    rows = list(rows)
+    if not rows:
+        return 0
+
+    conn = get_conn()
+    cursor = conn.cursor()
+    with transaction(conn):
+        cursor.executemany(INSERT_GAME_SQL, rows)
+        # AUTOINCREMENT hands out consecutive ids within one transaction
+        cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'games'")
+        first_id = cursor.fetchone()[0] - len(rows) + 1
+
+        players, cards = [], []
+        for game_id, row in enumerate(rows, first_id):
+            game_players, game_cards = normalize_game(game_id, *row[1:5])
+            players.extend(game_players)
+            cards.extend(game_cards)
+        cursor.executemany(INSERT_PLAYER_SQL, players)
+        cursor.executemany(INSERT_GAME_CARD_SQL, cards)
+        cursor.executemany(UPSERT_PLAYER_STATS_SQL, stats_rows(players))
+    return len(rows)
+
+def clean_imported_game(row, row_number):
+    """Applies record_game's checks to an imported row; returns the cleaned row, or None to skip it."""
+    game_date, players_str, winners_str, scores_str, cards_str, expansions_str, notes = row
+    players = split_field(players_str)
+    winners = []
+    for winner in split_field(winners_str):
+        if winner in players:
+            winners.append(winner)
+        elif players:
+            print(f"Warning: Row {row_number}: winner '{winner}' is not one of the players. Ignoring it.")
+    scores_dict = parse_scores(scores_str)
+
+    known_card_set = get_known_kingdom_card_set()
+    cards = []
+    for card in split_field(cards_str):
+        if card_may_be_known(card) and card in known_card_set:
+            cards.append(card)
+        else:
+            print(f"Warning: Row {row_number}: '{card}' is not a recognized Kingdom Card. Ignoring it.")
+
+    if not players:
+        reason = "no player names"
+    elif not winners:
+        reason = "no winner among the players"
+    elif not scores_dict:
+        reason = "no valid scores"
+    elif not cards:
+        reason = "no valid Kingdom Cards"
+    else:
+        return (
             game_date,
             ';'.join(players),
             ';'.join(winners),
             ';'.join([f"{k}:{v}" for k, v in scores_dict.items()]),
-            ';'.join(validated_kingdom_cards), # Use validated cards
-            ';'.join(expansions),
+            ';'.join(cards),
+            expansions_str,
             notes
-        ))
-        conn.commit()
-        print("Game recorded successfully! ✅")
-    except sqlite3.Error as e:
-        print(f"Database error: {e}")
-    finally:
-        conn.close()
+        )
+    print(f"Warning: Skipping row {row_number}: {reason}.")
+    return None
 
-def load_game_data():
-    """Loads all game data from the database."""
-    conn = connect_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, game_date, players, winners, scores, kingdom_cards, expansions_used, notes FROM games")
-    rows = cursor.fetchall()
-    conn.close()
+def scan_csv_records(buf):
+    """Yields the fields of each CSV record in buf as bytes, splitting on raw byte offsets."""
+    import csv
+    import io
 
-    games = []
-    for row in rows:
-        game_id, game_date, players_str, winners_str, scores_str, kingdom_cards_str, expansions_str, notes = row
-        
-        players = players_str.split(';') if players_str else []
-        winners = winners_str.split(';') if winners_str else []
-        
-        scores_dict = {}
-        if scores_str:
-            for s in scores_str.split(';'):
-                parts = s.split(':')
-                if len(parts) == 2:
-                    try:
-                        scores_dict[parts[0].strip()] = int(parts[1].strip())
-                    except ValueError:
-                        print(f"Warning: Could not parse score '{s}' for Game ID {game_id}. Skipping.")
-        
-        kingdom_cards = kingdom_cards_str.split(';') if kingdom_cards_str else []
-        expansions_used = expansions_str.split(';') if expansions_str else []
-
-        games.append({
-            'Game ID': game_id,
-            'Date': game_date,
-            'Players': players,
-            'Winner(s)': winners,
-            'Scores': scores_dict,
-            'Kingdom Cards': kingdom_cards,
-            'Expansions Used': expansions_used,
-            'Notes': notes
-        })
-    return games
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        end = buf.find(b'\n', pos)
+        if end == -1:
+            end = size
+        # Only a quote that opens a field starts quoting; one inside a field is literal
+        if buf[pos:pos + 1] == b'"' or buf.find(b',"', pos, end) != -1:
+            # Quoted fields may hide commas or newlines, so the csv module parses the rest
+            rest = io.StringIO(buf[pos:].decode('utf-8'), newline='')
+            for record in csv.reader(rest):
+                yield [field.encode('utf-8') for field in record] if record else [b'']
+            return
+        yield buf[pos:end].rstrip(b'\r').split(b',')
+        pos = end + 1
+
+def read_games_csv(path):
+    """Reads a CSV export of games into rows for record_games_bulk.
+
+    The file is memory-mapped and scanned with bytes.find, so only the fields
+    that are imported get decoded into Python strings.
+    """
+    import mmap
+
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("CSV file is empty.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            records = scan_csv_records(buf)
+            header = [h.decode('utf-8-sig').strip() for h in next(records)]
+            missing = [c for c in CSV_REQUIRED_COLUMNS if c not in header]
+            if missing:
+                raise ValueError(f"CSV file is missing column(s): {', '.join(missing)}")
+
+            # Positions of the games columns, in INSERT_GAME_SQL order
+            indices = [header.index(c) if c in header else None for c in CSV_REQUIRED_COLUMNS + CSV_OPTIONAL_COLUMNS]
+            rows = []
+            for fields in records:
+                if fields == [b'']: # Blank line
+                    continue
+                rows.append(tuple(
+                    fields[i].decode('utf-8') if i is not None and i < len(fields) else ''
+                    for i in indices
+                ))
+            return rows
+
+def import_games_csv():
+    """Prompts for a CSV export of games and imports every row into the database."""
+    import csv
+
+    print("\n--- Import Games from CSV ---")
+    path = input("Enter the path to the CSV file: ").strip()
+    if not path:
+        print("File path cannot be empty.")
+        return
+
+    try:
+        rows = read_games_csv(path)
+        valid_rows = [r for r in (clean_imported_game(row, i) for i, row in enumerate(rows, 1)) if r is not None]
+        count = record_games_bulk(valid_rows)
+        print(f"Imported {count} game(s) successfully! ✅")
+        if len(valid_rows) < len(rows):
+            print(f"Skipped {len(rows) - len(valid_rows)} invalid row(s). ⚠️")
+    except ValueError as e:
+        print(f"Error: {e}")
+    except (OSError, csv.Error) as e:
+        print(f"Error reading CSV file: {e}")
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
 
 def view_all_games():
     """Displays all recorded games."""
-    games = load_game_data()
-    if not games:
+    cursor = get_conn().cursor()
+    cursor.execute(SELECT_GAMES_WITH_PLAYERS_SQL)
+    first_row = cursor.fetchone()
+    if first_row is None:
         print("No games recorded yet. Start by recording a new game! 🎲")
         return
     
     print("\n--- All Recorded Dominion Games ---")
-    for game in games:
-        print(f"Game ID: {game['Game ID']}")
-        print(f"  Date: {game['Date']}")
-        print(f"  Players: {', '.join(game['Players'])}")
-        print(f"  Winner(s): {', '.join(game['Winner(s)'])}")
+    # Rows arrive ordered by game, so each group is one game's player rows
+    for game_id, rows in groupby(chain([first_row], cursor), key=itemgetter('id')):
+        rows = list(rows)
+        game = rows[0]
+        player_entries = [row for row in rows if row['player'] is not None]
+        expansions = split_field(game['expansions_used'])
+
+        print(f"Game ID: {game_id}")
+        print(f"  Date: {game['game_date']}")
+        print(f"  Players: {', '.join(p['player'] for p in player_entries)}")
+        print(f"  Winner(s): {', '.join(p['player'] for p in player_entries if p['is_winner'])}")
         print("  Scores:")
-        for player, score in game['Scores'].items():
-            print(f"    - {player}: {score}")
-        print(f"  Kingdom Cards: {', '.join(game['Kingdom Cards'])}")
-        print(f"  Expansions: {', '.join(game['Expansions Used']) if game['Expansions Used'] else 'None'}")
-        print(f"  Notes: {game['Notes'] if game['Notes'] else 'None'}")
+        for p in player_entries:
+            if p['score'] is not None:
+                print(f"    - {p['player']}: {p['score']}")
+        print(f"  Kingdom Cards: {game['cards'] or ''}")
+        print(f"  Expansions: {', '.join(expansions) if expansions else 'None'}")
+        print(f"  Notes: {game['notes'] if game['notes'] else 'None'}")
         print("-" * 30)
 
 def view_player_stats():
     """Calculates and displays statistics for each player."""
-    games = load_game_data()
-    if not games:
+    cursor = get_conn().cursor()
+    cursor.execute('''
+        SELECT player, games, wins, total_score, scored_games, max_score
+        FROM player_stats
+        ORDER BY player
+    ''')
+    first_row = cursor.fetchone()
+    if first_row is None:
         print("No games recorded yet. Start by recording a new game! 🎲")
         return
 
-    player_wins = defaultdict(int)
-    player_games = defaultdict(int)
-    player_total_score = defaultdict(int)
-    player_max_score = defaultdict(int)
-    
-    for game in games:
-        winners = game['Winner(s)']
-        scores = game['Scores']
-        
-        for player, score in scores.items():
-            player_games[player] += 1
-            player_total_score[player] += score
-            if score > player_max_score[player]:
-                player_max_score[player] = score
-        
-        for winner in winners:
-            if winner in player_games:
-                player_wins[winner] += 1
-            else:
-                print(f"Warning: Winner '{winner}' for Game ID {game['Game ID']} not found in players list for that game.")
-            
     print("\n--- Player Statistics ---")
-    if not player_games:
-        print("No player data found.")
-        return
+    for player, total_games, wins, total_score, scored_games, max_score in chain([first_row], cursor):
+        win_percentage = (wins / total_games) * 100
+        avg_score = f"{total_score / scored_games:.2f}" if scored_games > 0 else 'N/A'
 
-    for player in sorted(player_games.keys()):
-        total_games = player_games[player]
-        wins = player_wins[player]
-        win_percentage = (wins / total_games) * 100 if total_games > 0 else 0
-        avg_score = player_total_score[player] / total_games if total_games > 0 else 0
-        
         print(f"Player: {player}")
         print(f"  Games Played: {total_games}")
         print(f"  Wins: {wins}")
         print(f"  Win Rate: {win_percentage:.2f}%")
-        print(f"  Average Score: {avg_score:.2f}")
-        print(f"  Highest Score: {player_max_score[player]}")
+        print(f"  Average Score: {avg_score}")
+        print(f"  Highest Score: {max_score if max_score is not None else 'N/A'}")
         print("-" * 30)
 
+def export_leaderboard():
+    """Builds a top-N player leaderboard with polars and optionally saves it as CSV."""
+    try:
+        import polars as pl
+    except ImportError:
+        print("Error: Exporting the leaderboard requires polars. Install it with 'pip install polars'.")
+        return
+
+    print("\n--- Export Leaderboard ---")
+    top_input = input("How many top players to include? (leave blank for all): ").strip()
+    top_n = None
+    if top_input:
+        try:
+            top_n = int(top_input)
+        except ValueError:
+            top_n = 0
+        if top_n < 1:
+            print("Error: Please enter a whole number of at least 1.")
+            return
+
+    df = pl.read_database("SELECT player, score, is_winner FROM game_players", connection=get_conn())
+    if df.is_empty():
+        print("No games recorded yet. Start by recording a new game! 🎲")
+        return
+
+    leaderboard = (
+        df.group_by('player')
+        .agg(
+            pl.len().alias('games'),
+            pl.col('is_winner').sum().alias('wins'),
+            pl.col('score').mean().round(2).alias('avg_score'),
+            pl.col('score').max().alias('max_score'),
+        )
+        .with_columns((pl.col('wins') / pl.col('games') * 100).round(2).alias('win_rate'))
+        .sort(['wins', 'win_rate', 'player'], descending=[True, True, False])
+    )
+    if top_n is not None:
+        leaderboard = leaderboard.head(top_n)
+    # polars elides the middle of long tables by default, so show every row
+    with pl.Config(tbl_rows=-1, tbl_hide_dataframe_shape=True):
+        print(leaderboard)
+
+    path = input("Enter a CSV file to save the leaderboard to (leave blank to skip): ").strip()
+    if path:
+        try:
+            leaderboard.write_csv(path)
+            print(f"Leaderboard saved to {path}. ✅")
+        except OSError as e:
+            print(f"Error writing CSV file: {e}")
+
 def manage_kingdom_cards():
     """Menu for managing known Kingdom Cards."""
     while True:
@@ -338,6 +773,13 @@ def manage_kingdom_cards():
 
 def main():
     """Main function to run the Dominion stats tracker."""
+    parser = argparse.ArgumentParser(description="Track Dominion game results and player statistics.")
+    parser.add_argument('--in-memory', action='store_true',
+                        help=f"work on an in-memory copy of {DB_FILE}; changes are written back on Save or Exit")
+    args = parser.parse_args()
+    if args.in_memory:
+        use_in_memory_db()
+
     create_tables() # Ensure both database tables exist
     seed_kingdom_cards() # Populate initial cards if table is empty
     
@@ -346,8 +788,11 @@ def main():
         print("1. Record New Game ✍️")
         print("2. View All Games 📖")
         print("3. View Player Statistics 🏆")
-        print("4. Manage Kingdom Cards 🃏") # New menu option
-        print("5. Exit 🚪")
+        print("4. Manage Kingdom Cards 🃏")
+        print("5. Import Games from CSV 📥")
+        print("6. Export Leaderboard 📊")
+        print("7. Save to Disk 💾")
+        print("8. Exit 🚪")
         
         choice = input("Enter your choice: ")
         
@@ -360,7 +805,16 @@ def main():
         elif choice == '4':
             manage_kingdom_cards() # Call the new management function
         elif choice == '5':
+            import_games_csv()
+        elif choice == '6':
+            export_leaderboard()
+        elif choice == '7':
+            save_db()
+        elif choice == '8':
+            if _in_memory:
+                save_db()
             print("Exiting Dominion Stats Tracker. Happy gaming! 👋")
+            close_db()
             break
         else:
             print("Invalid choice. Please try again. 🤔")